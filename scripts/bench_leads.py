@@ -0,0 +1,93 @@
+# scripts/bench_leads.py
+"""
+Замер выдачи админского API лидов на синтетической таблице.
+
+    PYTHONPATH=. python scripts/bench_leads.py --rows 1000000
+
+По умолчанию пишет во временный SQLite; для замера на Postgres передайте --database-url.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_leads.db"
+
+    from sqlmodel import Session
+
+    from src.db import get_engine, init_db
+    from src.leads import Lead, count_leads_by_state, list_leads
+
+    init_db()
+    engine = get_engine()
+
+    states = ["menu", "order_style", "order_material", "order_confirm", "decline_reason", "manager_phone"]
+    stages = ["active", "declined", "handoff", "ordered"]
+    base = datetime(2026, 1, 1)
+    batch = 50_000
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, args.rows, batch):
+            conn.execute(
+                Lead.__table__.insert(),
+                [
+                    {
+                        "tg_id": i,
+                        "state": random.choice(states),
+                        "stage": random.choice(stages),
+                        "material_id": random.choice(["oregon", "canyon", "dakota", None]),
+                        "decline_reason": random.choice([None, None, "expensive", "other"]),
+                        "options": "",
+                        "created_at": base + timedelta(seconds=i),
+                        # грубое время обновления, чтобы были совпадения updated_at
+                        "updated_at": base + timedelta(minutes=random.randint(0, 200_000)),
+                    }
+                    for i in range(offset, min(offset + batch, args.rows))
+                ],
+            )
+    print(f"loaded {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+    scenarios = [
+        {},
+        {"state": "menu"},
+        {"stage": "ordered"},
+        {"stage": "ordered", "order_by": "created_at"},
+        {"material": "oregon", "order_by": "created_at"},
+        {"decline_reason": "other"},
+        {"state": "menu", "date_from": base + timedelta(days=30), "date_to": base + timedelta(days=60)},
+    ]
+    with Session(engine) as session:
+        for filters in scenarios:
+            timings = []
+            cursor = None
+            for _ in range(args.pages):
+                t0 = time.perf_counter()
+                _, cursor = list_leads(session, cursor=cursor, limit=args.limit, **filters)
+                timings.append((time.perf_counter() - t0) * 1000)
+                if cursor is None:
+                    break
+            print(f"{filters}: median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms")
+
+        for force in (True, False):
+            t0 = time.perf_counter()
+            count_leads_by_state(session, force=force)
+            label = "uncached" if force else "cached"
+            print(f"counts ({label}): {(time.perf_counter() - t0) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
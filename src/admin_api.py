@@ -0,0 +1,81 @@
+# src/admin_api.py
+from __future__ import annotations
+
+import os
+import secrets
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query
+from sqlmodel import Session
+
+from .db import get_engine
+from .leads import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    ORDER_BY_CREATED,
+    ORDER_BY_UPDATED,
+    Lead,
+    count_leads_by_state,
+    list_leads,
+)
+
+ADMIN_API_TOKEN = (os.getenv("ADMIN_API_TOKEN") or "").strip()
+ADMIN_PREFIX = "/admin"
+
+
+def _get_session() -> Iterator[Session]:
+    with Session(get_engine()) as session:
+        yield session
+
+
+def _require_admin(x_admin_token: str = Header(default="")) -> None:
+    if not ADMIN_API_TOKEN or not secrets.compare_digest(x_admin_token.encode(), ADMIN_API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="admin token required")
+
+
+def _lead_out(lead: Lead) -> Dict[str, Any]:
+    data = lead.model_dump()
+    data["options"] = [opt for opt in lead.options.split(",") if opt]
+    return data
+
+
+def mount_admin_routes(app: FastAPI) -> None:
+    router = APIRouter(prefix=ADMIN_PREFIX, dependencies=[Depends(_require_admin)])
+
+    @router.get("/leads")
+    def admin_list_leads(
+        state: Optional[str] = None,
+        stage: Optional[str] = None,
+        material: Optional[str] = None,
+        decline_reason: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        order_by: str = Query(default=ORDER_BY_UPDATED, pattern=f"^({ORDER_BY_UPDATED}|{ORDER_BY_CREATED})$"),
+        cursor: Optional[str] = None,
+        limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        session: Session = Depends(_get_session),
+    ) -> Dict[str, Any]:
+        try:
+            leads, next_cursor = list_leads(
+                session,
+                state=state,
+                stage=stage,
+                material=material,
+                decline_reason=decline_reason,
+                date_from=date_from,
+                date_to=date_to,
+                order_by=order_by,
+                cursor=cursor,
+                limit=limit,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return {"items": [_lead_out(lead) for lead in leads], "next_cursor": next_cursor}
+
+    @router.get("/leads/counts")
+    def admin_lead_counts(session: Session = Depends(_get_session)) -> Dict[str, Any]:
+        counts = count_leads_by_state(session)
+        return {"by_state": counts, "total": sum(counts.values())}
+
+    app.include_router(router)
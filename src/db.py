@@ -0,0 +1,45 @@
+# src/db.py
+from __future__ import annotations
+
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, create_engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = "sqlite:///./autochehol.db"
+
+_engine: Optional[Engine] = None
+
+
+def _database_url() -> str:
+    """
+    Render отдаёт строку вида postgres://..., SQLAlchemy ждёт явный драйвер.
+    Без DATABASE_URL работаем на локальном SQLite.
+    """
+    url = (os.getenv("DATABASE_URL") or "").strip() or DEFAULT_DATABASE_URL
+    if url.startswith("postgres://"):
+        url = "postgresql+psycopg://" + url[len("postgres://"):]
+    elif url.startswith("postgresql://"):
+        url = "postgresql+psycopg://" + url[len("postgresql://"):]
+    return url
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        url = _database_url()
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        _engine = create_engine(url, pool_pre_ping=True, connect_args=connect_args)
+    return _engine
+
+
+def init_db() -> None:
+    # импорт регистрирует таблицы в метаданных SQLModel
+    from . import leads  # noqa: F401
+
+    SQLModel.metadata.create_all(get_engine())
+    logger.info("Database schema ensured.")
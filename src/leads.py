@@ -0,0 +1,216 @@
+# src/leads.py
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, func, tuple_
+from sqlmodel import Field, Session, SQLModel, select
+
+ORDER_BY_UPDATED = "updated_at"
+ORDER_BY_CREATED = "created_at"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+COUNTS_TTL_SECONDS = float(os.getenv("LEAD_COUNTS_TTL_SECONDS", "30"))
+
+
+def _utcnow() -> datetime:
+    # храним naive UTC: одинаково ведёт себя в SQLite и Postgres (timestamp without time zone)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class Lead(SQLModel, table=True):
+    """
+    Нормализованный снимок лида: состояние FSM и выбранные параметры заказа.
+
+    Индексы повторяют сортировки админского API: на каждый фильтр есть
+    (фильтр, ts, id) для обеих колонок сортировки, так что выдача читает
+    страницу из индекса без сортировки в памяти.
+    """
+
+    __tablename__ = "leads"
+    __table_args__ = (
+        Index("ix_leads_state_updated", "state", "updated_at", "id"),
+        Index("ix_leads_state_created", "state", "created_at", "id"),
+        Index("ix_leads_stage_updated", "stage", "updated_at", "id"),
+        Index("ix_leads_stage_created", "stage", "created_at", "id"),
+        Index("ix_leads_material_updated", "material_id", "updated_at", "id"),
+        Index("ix_leads_material_created", "material_id", "created_at", "id"),
+        Index("ix_leads_decline_updated", "decline_reason", "updated_at", "id"),
+        Index("ix_leads_decline_created", "decline_reason", "created_at", "id"),
+        Index("ix_leads_updated", "updated_at", "id"),
+        Index("ix_leads_created", "created_at", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    tg_id: int = Field(sa_column=Column(BigInteger, unique=True, nullable=False))
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    phone: Optional[str] = None
+
+    state: str = ""
+    stage: str = ""
+
+    style_id: Optional[str] = None
+    material_id: Optional[str] = None
+    color_id: Optional[str] = None
+    insert_type_id: Optional[str] = None
+    options: str = ""
+    payment_id: Optional[str] = None
+
+    decline_reason: Optional[str] = None
+    decline_comment: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=_utcnow, sa_type=DateTime, nullable=False)
+    updated_at: datetime = Field(default_factory=_utcnow, sa_type=DateTime, nullable=False)
+
+
+def upsert_lead(session: Session, tg_id: int, fields: Dict[str, Any]) -> Lead:
+    """
+    Создаёт или обновляет лид по tg_id. Пишем только переданные поля:
+    отсутствующие в снимке значения остаются как есть. Если снимок не изменился,
+    запись не трогаем, чтобы updated_at отражал реальные изменения.
+    """
+    lead = session.exec(select(Lead).where(Lead.tg_id == tg_id)).first()
+    if lead is None:
+        lead = Lead(tg_id=tg_id, **fields)
+        session.add(lead)
+        session.commit()
+        session.refresh(lead)
+        return lead
+
+    changed = False
+    for key, value in fields.items():
+        if getattr(lead, key) != value:
+            setattr(lead, key, value)
+            changed = True
+
+    if changed:
+        lead.updated_at = _utcnow()
+        session.add(lead)
+        session.commit()
+        session.refresh(lead)
+    return lead
+
+
+def _filters_key(filters: Dict[str, Any]) -> str:
+    items = sorted((key, value.isoformat() if isinstance(value, datetime) else value) for key, value in filters.items())
+    raw = repr(items)
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def encode_cursor(order_by: str, filters_key: str, ts: datetime, lead_id: int) -> str:
+    raw = f"{order_by}|{filters_key}|{ts.isoformat()}|{lead_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        order_by, filters_key, ts_raw, id_raw = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 3)
+        return order_by, filters_key, datetime.fromisoformat(ts_raw), int(id_raw)
+    except Exception as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def list_leads(
+    session: Session,
+    *,
+    state: Optional[str] = None,
+    stage: Optional[str] = None,
+    material: Optional[str] = None,
+    decline_reason: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    order_by: str = ORDER_BY_UPDATED,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Lead], Optional[str]]:
+    """
+    Keyset-пагинация: новые сверху, курсор — (ts, id) последней строки страницы.
+    Курсор привязан к сортировке и фильтрам: чужой курсор даёт ValueError,
+    а не молча пропущенные строки.
+    Диапазон дат применяется к колонке сортировки, чтобы оставаться в индексе.
+    """
+    if order_by == ORDER_BY_UPDATED:
+        ts_col = Lead.updated_at
+    elif order_by == ORDER_BY_CREATED:
+        ts_col = Lead.created_at
+    else:
+        raise ValueError(f"unsupported order_by: {order_by}")
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if date_from is not None:
+        date_from = _naive_utc(date_from)
+    if date_to is not None:
+        date_to = _naive_utc(date_to)
+    filters_key = _filters_key(
+        {
+            "state": state,
+            "stage": stage,
+            "material": material,
+            "decline_reason": decline_reason,
+            "date_from": date_from,
+            "date_to": date_to,
+        }
+    )
+
+    query = select(Lead)
+    if state is not None:
+        query = query.where(Lead.state == state)
+    if stage is not None:
+        query = query.where(Lead.stage == stage)
+    if material is not None:
+        query = query.where(Lead.material_id == material)
+    if decline_reason is not None:
+        query = query.where(Lead.decline_reason == decline_reason)
+    if date_from is not None:
+        query = query.where(ts_col >= date_from)
+    if date_to is not None:
+        query = query.where(ts_col < date_to)
+    if cursor:
+        cursor_order_by, cursor_filters_key, last_ts, last_id = decode_cursor(cursor)
+        if cursor_order_by != order_by or cursor_filters_key != filters_key:
+            raise ValueError("invalid cursor")
+        query = query.where(tuple_(ts_col, Lead.id) < tuple_(last_ts, last_id))
+
+    query = query.order_by(ts_col.desc(), Lead.id.desc()).limit(limit + 1)
+    rows = list(session.exec(query).all())
+
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(order_by, filters_key, getattr(last, order_by), last.id)
+    return rows, next_cursor
+
+
+_counts_cache: Optional[Tuple[float, Dict[str, int]]] = None
+
+
+def count_leads_by_state(session: Session, *, force: bool = False) -> Dict[str, int]:
+    """
+    Агрегаты по состояниям FSM. GROUP BY по всей таблице дорогой,
+    поэтому результат кэшируется на COUNTS_TTL_SECONDS.
+    """
+    global _counts_cache
+    now = time.monotonic()
+    if not force and _counts_cache is not None and now - _counts_cache[0] < COUNTS_TTL_SECONDS:
+        return dict(_counts_cache[1])
+
+    rows = session.exec(select(Lead.state, func.count()).group_by(Lead.state)).all()
+    counts = {state: int(total) for state, total in rows}
+    _counts_cache = (now, counts)
+    return dict(counts)
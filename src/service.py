@@ -57,8 +57,40 @@ def _maybe_mount_telegram_routes() -> None:
 _maybe_mount_telegram_routes()
 
 
+# ---------------------------------------------------------------------
+# Admin API (лиды и статусы диалогов, ТЗ п. 8.4)
+# ---------------------------------------------------------------------
+def _maybe_mount_admin_routes() -> None:
+    """
+    Админские роуты монтируем только при заданном ADMIN_API_TOKEN,
+    чтобы данные лидов не оказались в открытом доступе.
+    """
+    token = (os.getenv("ADMIN_API_TOKEN") or "").strip()
+    if not token:
+        logger.warning("ADMIN_API_TOKEN missing -> admin routes NOT mounted.")
+        return
+
+    try:
+        from .admin_api import mount_admin_routes
+
+        mount_admin_routes(app)
+        logger.info("Admin routes mounted.")
+    except Exception as exc:
+        logger.exception("Failed to mount admin routes: %s", exc)
+
+
+_maybe_mount_admin_routes()
+
+
 @app.on_event("startup")
 async def on_startup():
+    try:
+        from .db import init_db
+
+        init_db()
+    except Exception as exc:
+        logger.exception("Database init failed: %s", exc)
+
     # запускаем PTB + ставим webhook (если токен/URL есть)
     token = (os.getenv("TELEGRAM_BOT_TOKEN") or "").strip()
     if not token:
@@ -1,11 +1,13 @@
 # src/telegram_bot/app.py
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 from typing import Optional
 
 from fastapi import APIRouter, FastAPI, Request
+from sqlmodel import Session
 from telegram import Update
 from telegram.ext import (
     Application,
@@ -16,7 +18,9 @@ from telegram.ext import (
     filters,
 )
 
-from .autochehol import handle_autochehol_callback, handle_autochehol_message, start_autochehol
+from ..db import get_engine
+from ..leads import upsert_lead
+from .autochehol import handle_autochehol_callback, handle_autochehol_message, lead_snapshot, start_autochehol
 
 logger = logging.getLogger(__name__)
 
@@ -34,22 +38,54 @@ def _build_application() -> Application:
 
     app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
 
-    app.add_handler(CommandHandler(["start", "autochehol"], start_autochehol))
+    app.add_handler(CommandHandler(["start", "autochehol"], _handle_start))
     app.add_handler(CallbackQueryHandler(_handle_callback))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, _handle_message))
 
     return app
 
 
+def _save_lead(tg_id: int, fields: dict) -> None:
+    with Session(get_engine()) as session:
+        upsert_lead(session, tg_id, fields)
+
+
+async def _record_lead(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Сохраняем снимок диалога в таблицу лидов. Ошибки БД только логируем:
+    бот должен отвечать клиенту, даже если база недоступна.
+    """
+    user = update.effective_user
+    if user is None:
+        return
+
+    fields = lead_snapshot(context)
+    fields["username"] = user.username
+    fields["first_name"] = user.first_name
+    try:
+        await asyncio.to_thread(_save_lead, user.id, fields)
+    except Exception as exc:
+        logger.exception("Failed to save lead %s: %s", user.id, exc)
+
+
+async def _handle_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    await start_autochehol(update, context)
+    await _record_lead(update, context)
+
+
 async def _handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     handled = await handle_autochehol_callback(update, context)
-    if not handled and update.callback_query:
+    if handled:
+        await _record_lead(update, context)
+    elif update.callback_query:
         await update.callback_query.answer()
 
 
 async def _handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     handled = await handle_autochehol_message(update, context)
-    if not handled and update.message:
+    if handled:
+        await _record_lead(update, context)
+    elif update.message:
         await update.message.reply_text("Напишите /start, чтобы открыть меню бота.")
 
 
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
 AUTO_STATE_KEY = "auto_state"
 AUTO_ORDER_KEY = "auto_order"
+LEAD_TRACKED_KEY = "lead_tracked"
 
 STATE_MENU = "menu"
 STATE_ORDER_STYLE = "order_style"
@@ -25,6 +26,11 @@ STATE_MANAGER_PHONE = "manager_phone"
 STATE_DECLINE_REASON = "decline_reason"
 STATE_DECLINE_OTHER = "decline_other"
 
+LEAD_STAGE_ACTIVE = "active"
+LEAD_STAGE_DECLINED = "declined"
+LEAD_STAGE_HANDOFF = "handoff"
+LEAD_STAGE_ORDERED = "ordered"
+
 
 @dataclass
 class OrderDraft:
@@ -89,6 +95,16 @@ def _order_from_context(context: ContextTypes.DEFAULT_TYPE) -> OrderDraft:
     return draft
 
 
+def _start_new_flow(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Новый заход в воронку: сбрасываем черновик заказа и флаги стадии лида."""
+    context.user_data[AUTO_ORDER_KEY] = OrderDraft()
+    context.user_data["order_confirmed"] = False
+    context.user_data["handoff_requested"] = False
+    context.user_data["decline_reason"] = None
+    context.user_data["decline_other"] = None
+    context.user_data[LEAD_TRACKED_KEY] = True
+
+
 def _set_state(context: ContextTypes.DEFAULT_TYPE, state: str) -> None:
     context.user_data[AUTO_STATE_KEY] = state
 
@@ -97,6 +113,55 @@ def _state(context: ContextTypes.DEFAULT_TYPE) -> str:
     return context.user_data.get(AUTO_STATE_KEY, "")
 
 
+def lead_snapshot(context: ContextTypes.DEFAULT_TYPE) -> Dict[str, Any]:
+    """
+    Плоский снимок диалога для таблицы лидов (админка, экспорт).
+
+    user_data живёт только в памяти процесса: после рестарта клиент может
+    продолжить со старой кнопки, и снимок знает лишь часть данных. Пока
+    пользователь не начал новый сценарий (/start, заказ), отдаём только
+    известные значения, чтобы не затереть сохранённые телефон, параметры и стадию.
+    """
+    user_data = context.user_data
+    data = user_data.get(AUTO_ORDER_KEY)
+    order = data if isinstance(data, OrderDraft) else OrderDraft()
+    phone = user_data.get("manager_phone") or user_data.get("specialist_phone")
+    decline_reason = user_data.get("decline_reason")
+
+    # стадия — по флагам текущего сценария; телефон из прошлых сценариев на неё не влияет
+    if user_data.get("order_confirmed"):
+        stage = LEAD_STAGE_ORDERED
+    elif user_data.get("handoff_requested"):
+        stage = LEAD_STAGE_HANDOFF
+    elif decline_reason:
+        stage = LEAD_STAGE_DECLINED
+    else:
+        stage = LEAD_STAGE_ACTIVE
+
+    snapshot: Dict[str, Any] = {
+        "state": _state(context),
+        "stage": stage,
+        "style_id": order.style_id,
+        "material_id": order.material_id,
+        "color_id": order.color_id,
+        "insert_type_id": order.insert_type_id,
+        "options": ",".join(order.options),
+        "payment_id": order.payment_id,
+        "decline_reason": decline_reason,
+        "decline_comment": user_data.get("decline_other"),
+    }
+    # телефон — контакт, а не часть сценария: его не сбрасываем никогда
+    if phone:
+        snapshot["phone"] = phone
+
+    if user_data.get(LEAD_TRACKED_KEY):
+        return snapshot
+
+    if stage == LEAD_STAGE_ACTIVE:
+        del snapshot["stage"]
+    return {key: value for key, value in snapshot.items() if value not in (None, "")}
+
+
 def _kb(rows: List[List[InlineKeyboardButton]]) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(rows)
 
@@ -220,6 +285,7 @@ def kb_confirm() -> InlineKeyboardMarkup:
 
 
 async def start_autochehol(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    _start_new_flow(context)
     _set_state(context, STATE_MENU)
     if update.message:
         await update.message.reply_text(
@@ -244,8 +310,8 @@ async def handle_autochehol_callback(update: Update, context: ContextTypes.DEFAU
         return True
 
     if data == "AUTO:ORDER":
+        _start_new_flow(context)
         _set_state(context, STATE_ORDER_STYLE)
-        _order_from_context(context)
         await query.edit_message_text("Выберите стиль:", reply_markup=kb_styles())
         return True
 
@@ -306,6 +372,7 @@ async def handle_autochehol_callback(update: Update, context: ContextTypes.DEFAU
         return True
 
     if data == "AUTO:CONFIRM":
+        context.user_data["order_confirmed"] = True
         _set_state(context, STATE_MENU)
         await query.edit_message_text(
             "Спасибо! Передал менеджеру, он свяжется с вами в рабочее время 9:00–18:00.",
@@ -358,6 +425,10 @@ async def handle_autochehol_callback(update: Update, context: ContextTypes.DEFAU
 
     if data.startswith("AUTO:DECLINE:"):
         reason = data.split(":", 2)[2]
+        # отказ отменяет прежний итог сценария; передача менеджеру после отказа снова даст handoff
+        context.user_data["decline_reason"] = reason
+        context.user_data["order_confirmed"] = False
+        context.user_data["handoff_requested"] = False
         if reason == "expensive":
             _set_state(context, STATE_MENU)
             await query.edit_message_text(
@@ -437,6 +508,7 @@ async def handle_autochehol_message(update: Update, context: ContextTypes.DEFAUL
 
     if state == STATE_SPECIALIST_PHONE:
         context.user_data["specialist_phone"] = text
+        context.user_data["handoff_requested"] = True
         _set_state(context, STATE_MENU)
         await update.message.reply_text(
             "Спасибо! Передал менеджеру, свяжется в рабочее время 9:00–18:00.",
@@ -452,6 +524,7 @@ async def handle_autochehol_message(update: Update, context: ContextTypes.DEFAUL
 
     if state == STATE_MANAGER_PHONE:
         context.user_data["manager_phone"] = text
+        context.user_data["handoff_requested"] = True
         _set_state(context, STATE_MENU)
         await update.message.reply_text(
             "Спасибо! Менеджер получил заявку и свяжется с вами.",
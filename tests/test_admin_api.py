@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from src import admin_api
+from src.leads import upsert_lead
+
+TOKEN = "secret"
+
+
+@pytest.fixture()
+def client(engine, monkeypatch):
+    monkeypatch.setattr(admin_api, "ADMIN_API_TOKEN", TOKEN)
+
+    def _session():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    admin_api.mount_admin_routes(app)
+    app.dependency_overrides[admin_api._get_session] = _session
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {},
+        {"X-Admin-Token": "wrong"},
+        {"X-Admin-Token": "é".encode("latin-1")},
+    ],
+)
+def test_requires_admin_token(client, headers):
+    assert client.get("/admin/leads", headers=headers).status_code == 401
+    assert client.get("/admin/leads/counts", headers=headers).status_code == 401
+
+
+def test_bad_cursor_returns_400(client):
+    response = client.get("/admin/leads", params={"cursor": "broken"}, headers={"X-Admin-Token": TOKEN})
+    assert response.status_code == 400
+
+
+def test_lists_leads_page_by_page(client, session):
+    for tg_id in range(3):
+        upsert_lead(session, tg_id, {"state": "menu", "options": "1,3"})
+    headers = {"X-Admin-Token": TOKEN}
+
+    first = client.get("/admin/leads", params={"limit": 2}, headers=headers).json()
+    second = client.get("/admin/leads", params={"limit": 2, "cursor": first["next_cursor"]}, headers=headers).json()
+
+    assert len(first["items"]) == 2
+    assert first["items"][0]["options"] == ["1", "3"]
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+    counts = client.get("/admin/leads/counts", headers=headers).json()
+    assert counts == {"by_state": {"menu": 3}, "total": 3}
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from src.leads import upsert_lead
+from src.telegram_bot.autochehol import (
+    AUTO_ORDER_KEY,
+    AUTO_STATE_KEY,
+    LEAD_STAGE_ACTIVE,
+    LEAD_STAGE_DECLINED,
+    LEAD_STAGE_HANDOFF,
+    OrderDraft,
+    _start_new_flow,
+    handle_autochehol_callback,
+    handle_autochehol_message,
+    lead_snapshot,
+)
+
+
+def _context(**user_data):
+    return SimpleNamespace(user_data=dict(user_data))
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+def _press(context, data):
+    query = SimpleNamespace(data=data, edit_message_text=_noop)
+    asyncio.run(handle_autochehol_callback(SimpleNamespace(callback_query=query), context))
+
+
+def _type(context, text):
+    message = SimpleNamespace(text=text, reply_text=_noop)
+    asyncio.run(handle_autochehol_message(SimpleNamespace(message=message), context))
+
+
+def test_snapshot_after_restart_does_not_wipe_stored_lead(session):
+    before = _context(**{AUTO_STATE_KEY: "menu"})
+    _start_new_flow(before)
+    before.user_data[AUTO_ORDER_KEY].material_id = "oregon"
+    before.user_data["decline_reason"] = "expensive"
+    before.user_data["manager_phone"] = "+7999"
+    before.user_data["handoff_requested"] = True
+    upsert_lead(session, 42, lead_snapshot(before))
+
+    # процесс перезапустился: user_data пуст, клиент жмёт старую кнопку
+    after = _context(**{AUTO_STATE_KEY: "order_payment", AUTO_ORDER_KEY: OrderDraft(payment_id="2")})
+    lead = upsert_lead(session, 42, lead_snapshot(after))
+
+    assert lead.state == "order_payment"
+    assert lead.payment_id == "2"
+    assert (lead.phone, lead.stage, lead.decline_reason, lead.material_id) == (
+        "+7999",
+        LEAD_STAGE_HANDOFF,
+        "expensive",
+        "oregon",
+    )
+
+
+def test_new_flow_clears_decline_and_order():
+    context = _context(**{AUTO_STATE_KEY: "menu"})
+    _start_new_flow(context)
+    context.user_data["decline_reason"] = "browsing"
+    context.user_data["order_confirmed"] = True
+    context.user_data[AUTO_ORDER_KEY].material_id = "canyon"
+    assert lead_snapshot(context)["stage"] != LEAD_STAGE_ACTIVE
+
+    _start_new_flow(context)
+    snapshot = lead_snapshot(context)
+
+    assert snapshot["stage"] == LEAD_STAGE_ACTIVE
+    assert snapshot["decline_reason"] is None
+    assert snapshot["material_id"] is None
+
+
+def test_decline_sets_declined_stage():
+    context = _context(**{AUTO_STATE_KEY: "decline_other"})
+    _start_new_flow(context)
+    context.user_data["decline_reason"] = "other"
+
+    assert lead_snapshot(context)["stage"] == LEAD_STAGE_DECLINED
+
+
+def _leave_manager_phone(context):
+    _press(context, "AUTO:MANAGER")
+    _type(context, "Вопрос по доставке")
+    _type(context, "+7999")
+
+
+def test_phone_from_earlier_flow_does_not_mask_new_decline():
+    context = _context()
+    _start_new_flow(context)
+    _leave_manager_phone(context)
+    assert lead_snapshot(context)["stage"] == LEAD_STAGE_HANDOFF
+
+    _press(context, "AUTO:ORDER")
+    assert lead_snapshot(context)["stage"] == LEAD_STAGE_ACTIVE
+
+    _press(context, "AUTO:DECLINE")
+    _press(context, "AUTO:DECLINE:expensive")
+    snapshot = lead_snapshot(context)
+
+    assert snapshot["stage"] == LEAD_STAGE_DECLINED
+    assert snapshot["phone"] == "+7999"
+
+
+def test_latest_outcome_of_flow_wins():
+    context = _context()
+    _start_new_flow(context)
+    _leave_manager_phone(context)
+    _press(context, "AUTO:DECLINE:browsing")
+    assert lead_snapshot(context)["stage"] == LEAD_STAGE_DECLINED
+
+    _press(context, "AUTO:DECLINE:missing")
+    _type(context, "Нужен серый салон")
+    _type(context, "+7888")
+    assert lead_snapshot(context)["stage"] == LEAD_STAGE_HANDOFF
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.leads import ORDER_BY_CREATED, Lead, count_leads_by_state, list_leads, upsert_lead
+
+BASE = datetime(2026, 1, 1, 12, 0)
+_tg_ids = itertools.count(1000)
+
+
+def _add_leads(session, count, **fields):
+    for _ in range(count):
+        data = {"state": "menu", "stage": "active", "created_at": BASE, "updated_at": BASE}
+        data.update(fields)
+        session.add(Lead(tg_id=next(_tg_ids), **data))
+        session.commit()
+
+
+def _walk(session, limit, **filters):
+    pages = []
+    cursor = None
+    while True:
+        rows, cursor = list_leads(session, cursor=cursor, limit=limit, **filters)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+def test_keyset_walk_with_tied_timestamps_has_no_gaps_or_duplicates(session):
+    _add_leads(session, 25)
+
+    pages = _walk(session, limit=7)
+    ids = [lead.id for page in pages for lead in page]
+
+    assert [len(page) for page in pages] == [7, 7, 7, 4]
+    assert ids == sorted(range(1, 26), reverse=True)
+
+
+def test_walk_respects_filter_and_created_order(session):
+    for i in range(6):
+        stage = "ordered" if i % 2 else "active"
+        _add_leads(session, 1, stage=stage, created_at=BASE + timedelta(minutes=i))
+
+    pages = _walk(session, limit=2, stage="ordered", order_by=ORDER_BY_CREATED)
+    created = [lead.created_at for page in pages for lead in page]
+
+    assert created == [BASE + timedelta(minutes=m) for m in (5, 3, 1)]
+
+
+def test_tz_aware_date_range_is_compared_in_utc(session):
+    _add_leads(session, 1)
+
+    inside, _ = list_leads(
+        session,
+        date_from=datetime.fromisoformat("2026-01-01T14:00:00+03:00"),
+        date_to=datetime.fromisoformat("2026-01-01T15:00:01+03:00"),
+    )
+    outside, _ = list_leads(session, date_to=datetime.fromisoformat("2026-01-01T15:00:00+03:00"))
+
+    assert len(inside) == 1
+    assert outside == []
+
+
+@pytest.mark.parametrize(
+    "replay",
+    [
+        {"order_by": ORDER_BY_CREATED},
+        {"state": "menu"},
+    ],
+)
+def test_cursor_from_other_query_is_rejected(session, replay):
+    _add_leads(session, 3)
+    _, cursor = list_leads(session, limit=1)
+
+    with pytest.raises(ValueError, match="invalid cursor"):
+        list_leads(session, cursor=cursor, limit=1, **replay)
+
+
+def test_garbage_cursor_is_rejected(session):
+    with pytest.raises(ValueError, match="invalid cursor"):
+        list_leads(session, cursor="not-a-cursor")
+
+
+def test_upsert_without_changes_keeps_updated_at(session):
+    lead = upsert_lead(session, 42, {"state": "menu", "stage": "active"})
+    lead.updated_at = BASE
+    session.add(lead)
+    session.commit()
+
+    lead = upsert_lead(session, 42, {"state": "menu", "stage": "active"})
+    assert lead.updated_at == BASE
+
+    lead = upsert_lead(session, 42, {"state": "order_style"})
+    assert lead.updated_at > BASE
+
+
+def test_upsert_keeps_fields_missing_from_snapshot(session):
+    upsert_lead(session, 42, {"state": "menu", "stage": "handoff", "phone": "+7999"})
+
+    lead = upsert_lead(session, 42, {"state": "order_style"})
+
+    assert (lead.phone, lead.stage, lead.state) == ("+7999", "handoff", "order_style")
+
+
+def test_counts_are_cached_until_forced(session):
+    _add_leads(session, 2)
+    assert count_leads_by_state(session) == {"menu": 2}
+
+    _add_leads(session, 1, state="order_style")
+    assert count_leads_by_state(session) == {"menu": 2}
+    assert count_leads_by_state(session, force=True) == {"menu": 2, "order_style": 1}
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from sqlmodel import Session, select
+
+from src.leads import Lead
+from src.telegram_bot import app as telegram_app
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+def _callback_update(data):
+    query = SimpleNamespace(data=data, edit_message_text=_noop, answer=_noop)
+    user = SimpleNamespace(id=777, username="driver", first_name="Иван")
+    return SimpleNamespace(callback_query=query, effective_user=user)
+
+
+def test_handled_callback_saves_lead_snapshot(engine, monkeypatch):
+    monkeypatch.setattr(telegram_app, "get_engine", lambda: engine)
+    context = SimpleNamespace(user_data={})
+
+    asyncio.run(telegram_app._handle_callback(_callback_update("AUTO:ORDER"), context))
+
+    with Session(engine) as session:
+        lead = session.exec(select(Lead).where(Lead.tg_id == 777)).one()
+    assert (lead.username, lead.first_name) == ("driver", "Иван")
+    assert (lead.state, lead.stage) == ("order_style", "active")
+
+
+def test_database_error_is_logged_not_raised(monkeypatch, caplog):
+    def _fail(tg_id, fields):
+        raise RuntimeError("db is down")
+
+    monkeypatch.setattr(telegram_app, "_save_lead", _fail)
+    context = SimpleNamespace(user_data={})
+
+    with caplog.at_level(logging.ERROR, logger=telegram_app.logger.name):
+        asyncio.run(telegram_app._handle_callback(_callback_update("AUTO:MENU"), context))
+
+    assert "Failed to save lead 777" in caplog.text
+    assert context.user_data["auto_state"] == "menu"